@@ -1,13 +1,14 @@
-import argparse
+import asyncio
+import functools
 import logging
 import os
-import uuid
-from typing import Any, Dict, Optional
+import secrets
+from typing import Optional
 
 from common import create_parser, setup_logging
 from dotenv import load_dotenv
 from google.adk.agents import Agent
-from google.adk.events import Event
+from google.adk.models import Gemini
 from google.adk.runners import InMemoryRunner
 from google.adk.tools import FunctionTool
 from google.genai import types
@@ -18,6 +19,10 @@ load_dotenv()
 # Set up logger
 logger: logging.Logger = logging.getLogger(__name__)  # type: ignore[attr-defined]
 
+# Cap the number of coordinator runs in flight to stay under the provider's rate limits
+MAX_CONCURRENT_REQUESTS = 4
+request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
 # --- Define Tool Functions
 
 # These functions simulate the actions of the specialist agents.
@@ -57,11 +62,27 @@ def unclear_handler(request: str) -> str:
     return f"Coordinator could not delegate request: '{request}'. Please clarify."
 
 
+class CachedFunctionTool(FunctionTool):
+    """A FunctionTool that builds its function declaration only once.
+
+    ADK rebuilds the declaration from the function's signature and docstring for
+    every model request, but for a plain function it never changes.
+    """
+
+    @functools.cached_property
+    def _declaration(self) -> Optional[types.FunctionDeclaration]:
+        return super()._get_declaration()
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self._declaration
+
+
 # -- Create Tools from Functions ---
-booking_tool = FunctionTool(booking_handler)
-info_tool = FunctionTool(info_handler)
+booking_tool = CachedFunctionTool(booking_handler)
+info_tool = CachedFunctionTool(info_handler)
 
 
+@functools.lru_cache(maxsize=1)
 def get_model_name() -> str:
     """Get the Google model name from environment variables."""
     model_name = os.getenv("GOOGLE_MODEL")
@@ -70,101 +91,128 @@ def get_model_name() -> str:
     return model_name
 
 
-# Define specialized sub-agents equipped with their respective tools
-booking_agent = Agent(
-    name="Booker",
-    model=get_model_name(),
-    description="A specialized agent that handles all flight and hotel booking requests by calling the booking tool.",
-    tools=[booking_tool],
-)
-
-info_agent = Agent(
-    name="Info",
-    model=get_model_name(),
-    description="A specialized agent that provides general information and answers user questions by calling the info tool.",
-    tools=[info_tool],
-)
-
-# Define the parent agent with explicit delegation instructions
-
-coordinator = Agent(
-    name="Coordinator",
-    model=get_model_name(),
-    instruction="""
-     You are the main coordinator. Your only task is to analyze incoming user requests.
-     and delegate them to the appropriate specialist agent. Do not try to answer the user directly.\n
-     - For any requests related to booking flights or hotels, delegate to the 'Booker' agent.\n
-     - For all other general information questions, delegate to the 'Info' agent.
-    """,
-    description="A coordinator that routes user requests to the correct specialist agent.",
-    sub_agents=[booking_agent, info_agent],
-)
+@functools.cache
+def get_model() -> Gemini:
+    """Shared Gemini model for all agents.
+
+    Agents given a model name build a new Gemini client (and HTTP connection pool)
+    for every model call. Sharing one instance keeps the connections warm across
+    agents and across concurrent coordinator runs.
+    """
+    return Gemini(model=get_model_name())
+
+
+@functools.cache
+def get_coordinator() -> Agent:
+    """Builds the coordinator and its specialist sub-agents on first use."""
+    # Define specialized sub-agents equipped with their respective tools
+    booking_agent = Agent(
+        name="Booker",
+        model=get_model(),
+        description="A specialized agent that handles all flight and hotel booking requests by calling the booking tool.",
+        tools=[booking_tool],
+    )
+
+    info_agent = Agent(
+        name="Info",
+        model=get_model(),
+        description="A specialized agent that provides general information and answers user questions by calling the info tool.",
+        tools=[info_tool],
+    )
+
+    # Define the parent agent with explicit delegation instructions
+    return Agent(
+        name="Coordinator",
+        model=get_model(),
+        instruction="""
+         You are the main coordinator. Your only task is to analyze incoming user requests.
+         and delegate them to the appropriate specialist agent. Do not try to answer the user directly.\n
+         - For any requests related to booking flights or hotels, delegate to the 'Booker' agent.\n
+         - For all other general information questions, delegate to the 'Info' agent.
+        """,
+        description="A coordinator that routes user requests to the correct specialist agent.",
+        sub_agents=[booking_agent, info_agent],
+    )
 
 
 # --- Execution logic ---
 async def run_coordinator(runner: InMemoryRunner, request: str) -> str:
     """Runs the coordinator agent with a given requests and delegates."""
-    logger.info(f"\n---Running Coordinator with request: '{request}' ---")
+    logger.info("\n---Running Coordinator with request: '%s' ---", request)
 
     final_result: str = ""
 
-    try:
-        user_id = "user_123"
-        session_id = str(uuid.uuid4())
-        await runner.session_service.create_session(
-            app_name=runner.app_name, user_id=user_id, session_id=session_id
-        )
-
-        for event in runner.run(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=types.Content(role="user", parts=[types.Part(text=request)]),
-        ):
-            if event.is_final_response() and event.content:
-                # Try to get text directly from event.content to avoid iterating over parts
-                if hasattr(event.content, "text") and event.content.text:
-                    final_result = str(event.content.text)
-                elif event.content.parts:
-                    # Fallback: iterated through parts and extract text (might trigger warning)
-                    text_parts = [
-                        part.text for part in event.content.parts if part.text
-                    ]
-                    final_result = "".join(text_parts)
-                    # Assuming the loop should break after the final response
-                    break
-
-        logger.info(f"Coordinator Final Response: {final_result}")
-        return final_result
-
-    except Exception as e:
-        logger.error(f"An error occurred while processing your request: {e}")
-        return f"Sorry, an error occurred while processing your request: {e}."
+    async with request_semaphore:
+        try:
+            user_id = "user_123"
+            session_id = secrets.token_hex(8)
+            await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=user_id, session_id=session_id
+            )
+
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=types.Content(
+                    role="user", parts=[types.Part(text=request)]
+                ),
+            ):
+                if event.is_final_response() and event.content:
+                    # Try to get text directly from event.content to avoid iterating over parts
+                    if hasattr(event.content, "text") and event.content.text:
+                        final_result = str(event.content.text)
+                    elif event.content.parts:
+                        # Fallback: iterated through parts and extract text (might trigger warning)
+                        text_parts = [
+                            part.text for part in event.content.parts if part.text
+                        ]
+                        final_result = "".join(text_parts)
+                        # Assuming the loop should break after the final response
+                        break
+
+            logger.info("Coordinator Final Response: %s", final_result)
+            return final_result
+
+        except Exception as e:
+            logger.error("An error occurred while processing your request: %s", e)
+            return f"Sorry, an error occurred while processing your request: {e}."
+
+
+async def run_coordinator_batch(
+    runner: InMemoryRunner, requests: list[str]
+) -> list[str]:
+    """Runs a batch of requests through the coordinator and returns results in order.
+
+    ADK runs one session per request, so there is no single multi-prompt call to
+    make. Instead, identical requests are only sent once and the distinct ones
+    share the runner and run concurrently (bounded by `request_semaphore`).
+    """
+    unique_requests = list(dict.fromkeys(requests))
+    unique_results = await asyncio.gather(
+        *(run_coordinator(runner, request) for request in unique_requests)
+    )
+    results_by_request = dict(zip(unique_requests, unique_results))
+    return [results_by_request[request] for request in requests]
 
 
 async def main() -> None:
     """Main function to run the ADK example"""
     logger.info("---Google ADK Routing Example (ADK Auto-Flow Style)---")
-    runner = InMemoryRunner(coordinator)
+    runner = InMemoryRunner(get_coordinator())
 
-    # Example usage
-    result_a = await run_coordinator(runner, "Book me a hotel in Paris.")
-    print(f"Final Output A: {result_a}")
-
-    result_b = await run_coordinator(
-        runner, "What is the highest mountain in the world?"
-    )
-    print(f"Final Output B: {result_b}")
-
-    result_c = await run_coordinator(runner, "Tell me a random fact.")
-    print(f"Final Output C: {result_c}")
-
-    result_d = await run_coordinator(runner, "Find flights to Tokyo in the next month.")
-    print(f"Final Output D: {result_d}")
+    # Example usage. Each request gets its own session, so they can run concurrently.
+    requests = [
+        "Book me a hotel in Paris.",
+        "What is the highest mountain in the world?",
+        "Tell me a random fact.",
+        "Find flights to Tokyo in the next month.",
+    ]
+    results = await run_coordinator_batch(runner, requests)
+    for label, result in zip("ABCD", results):
+        print(f"Final Output {label}: {result}")
 
 
 if __name__ == "__main__":
-    import asyncio
-
     parser = create_parser("Routing pattern demo with Google Agent Development Kit")
     args = parser.parse_args()
 
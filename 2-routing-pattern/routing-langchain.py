@@ -1,18 +1,24 @@
-import argparse
+import functools
 import json
 import logging
 import os
-from typing import Any, Dict
+from typing import Any
 
+import numpy as np
 from common import create_parser, setup_logging
+from common.semantic_cache import SemanticCache
 from dotenv import load_dotenv
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import (
-    RunnableBranch,
+    Runnable,
+    RunnableLambda,
     RunnablePassthrough,
 )
 from langchain_google_genai import ChatGoogleGenerativeAI
+from sentence_transformers import SentenceTransformer
 
 load_dotenv()
 
@@ -20,17 +26,24 @@ load_dotenv()
 # Set up logger
 logger: logging.Logger = logging.getLogger(__name__)  # type: ignore[attr-defined]
 
+# The router runs at temperature=0 and only ever answers with one of three words,
+# so repeated requests are answered from a local on-disk cache.
+set_llm_cache(SQLiteCache(database_path=".langchain.db"))
+
 
 def log_llm_output(output: Any, step_name: str) -> None:
     """Log LLM output at DEBUG level"""
-    logger.debug(f"\n=== {step_name} LLM OUTPUT ===")
-    logger.debug(f"Type: {type(output)}")
-    logger.debug(f"Raw output: {repr(output)}")
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("\n=== %s LLM OUTPUT ===", step_name)
+    logger.debug("Type: %s", type(output))
+    logger.debug("Raw output: %r", output)
     if hasattr(output, "content"):
-        logger.debug(f"Content: {output.content}")
+        logger.debug("Content: %s", output.content)
     if hasattr(output, "response_metadata"):
         logger.debug(
-            f"Response metadata: {json.dumps(output.response_metadata, indent=2, default=str)}"
+            "Response metadata: %s",
+            json.dumps(output.response_metadata, indent=2, default=str),
         )
     logger.debug("=== END LLM OUTPUT ===\n")
 
@@ -61,10 +74,10 @@ def initialize_llm() -> ChatGoogleGenerativeAI | None:
             raise ValueError("GOOGLE_MODEL environment variable is required")
 
         llm = ChatGoogleGenerativeAI(model=model_name, temperature=0.0)
-        logger.info(f"Language model initialized: {llm.model}")
+        logger.info("Language model initialized: %s", llm.model)
         return llm
     except Exception as e:
-        logger.error(f"Error initializing language model: {e}")
+        logger.error("Error initializing language model: %s", e)
         return None
 
 
@@ -72,7 +85,83 @@ llm = initialize_llm()
 
 # Define Coordinator Router Chain
 
-# First, the chain decides which handler to delegate to
+# First, the chain decides which handler to delegate to.
+# Most requests are routed locally by comparing a sentence embedding of the request
+# with embeddings of example phrases for each handler. Only requests that are not
+# close enough to any handler fall back to asking the LLM.
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Below this cosine similarity the local router is not confident enough to decide
+MIN_ROUTE_SIMILARITY = 0.4
+
+ROUTE_PROTOTYPES: dict[str, list[str]] = {
+    "booker": [
+        "Reserve a double room for two nights",
+        "I need plane tickets for the holidays",
+        "Get me a seat on the morning flight to Madrid",
+        "Change my hotel reservation to Friday",
+        "Are there cheap flights to Lisbon next weekend?",
+    ],
+    "info": [
+        "Who painted the Mona Lisa?",
+        "Explain how photosynthesis works",
+        "What year did the Berlin Wall fall?",
+        "How far is the Moon from Earth?",
+        "Which river is the longest in Africa?",
+    ],
+}
+
+
+@functools.cache
+def get_embedder() -> SentenceTransformer:
+    """Load the sentence embedding model on first use."""
+    logger.info("Loading embedding model: %s", EMBEDDING_MODEL)
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+@functools.cache
+def get_route_centroids() -> dict[str, np.ndarray]:
+    """Mean of the normalized prototype embeddings for each route.
+
+    For normalized vectors, the dot product with this mean equals the mean cosine
+    similarity to the route's prototype phrases.
+    """
+    embedder = get_embedder()
+    return {
+        route: embedder.encode(phrases, normalize_embeddings=True).mean(axis=0)
+        for route, phrases in ROUTE_PROTOTYPES.items()
+    }
+
+
+def classify_request(embedding: np.ndarray) -> str | None:
+    """Pick the route whose prototype phrases are most similar to a request embedding.
+
+    Returns None when no route is similar enough to decide locally.
+    """
+    scores = {
+        route: float(np.dot(embedding, centroid))
+        for route, centroid in get_route_centroids().items()
+    }
+    route, score = max(scores.items(), key=lambda item: item[1])
+    logger.debug("Embedding route scores: %s", scores)
+    return route if score >= MIN_ROUTE_SIMILARITY else None
+
+
+# Remember earlier routing decisions so repeated or paraphrased requests skip
+# the router entirely.
+ROUTER_CACHE_PATH = "router-cache"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+
+@functools.cache
+def get_router_cache() -> SemanticCache:
+    return SemanticCache(
+        dimension=get_embedder().get_sentence_embedding_dimension(),
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        path=ROUTER_CACHE_PATH,
+    )
+
 
 coordinator_router_prompt = ChatPromptTemplate.from_messages(
     [
@@ -91,37 +180,68 @@ coordinator_router_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-if llm:
 
-    def log_and_parse(output: Any) -> str:
-        log_llm_output(output, "COORDINATOR_ROUTER")
-        return StrOutputParser().invoke(output)
+def log_and_parse(output: Any) -> str:
+    log_llm_output(output, "COORDINATOR_ROUTER")
+    return StrOutputParser().invoke(output)
 
-    coordinator_router_chain = coordinator_router_prompt | llm | log_and_parse
 
-    # ---Define the delegation logic, which is equivalent to ADK's Auto-Flow based on sub_agents) ---
+llm_router_chain = (coordinator_router_prompt | llm | log_and_parse) if llm else None
 
-    # Use RunnableBranch to route based on the router chain's output
 
-    branches = {
-        "booker": RunnablePassthrough.assign(
-            output=lambda x: booking_handler(x["request"]["request"])
-        ),
-        "info": RunnablePassthrough.assign(
-            output=lambda x: info_handler(x["request"]["request"])
-        ),
-        "unclear": RunnablePassthrough.assign(
-            output=lambda x: unclear_handler(x["request"]["request"])
-        ),
-    }
+def route_request(x: dict[str, str]) -> str:
+    """Route a request, trying the semantic cache, then embeddings, then the LLM."""
+    embedding = get_embedder().encode(x["request"], normalize_embeddings=True)
+    router_cache = get_router_cache()
 
-# Create the RunnableBranch. It takes the output of the router chain `coordinator_router_chain`
-# and routes the original input (`request`) to the corresponding handler.
-delegation_branch = RunnableBranch(
-    (lambda x: x["decision"].strip() == "booker", branches["booker"]),
-    (lambda x: x["decision"].strip() == "info", branches["info"]),
-    branches["unclear"],  # Default branch for 'unclear' or any other output
-)
+    decision = router_cache.lookup(embedding)
+    if decision is not None:
+        logger.info("Router cache hit: '%s'", decision)
+        return decision
+
+    decision = classify_request(embedding)
+    if decision is not None:
+        logger.info("Routed locally to '%s'", decision)
+        # Cheaper to classify again than to rewrite the cache files
+        return decision
+
+    if llm_router_chain is None:
+        return "unclear"
+
+    decision = llm_router_chain.invoke(x).strip()
+    router_cache.add(embedding, decision)
+    return decision
+
+
+coordinator_router_chain = RunnableLambda(route_request)
+
+# ---Define the delegation logic, which is equivalent to ADK's Auto-Flow based on sub_agents) ---
+
+# Look up the handler for the router chain's output in a dict
+
+branches = {
+    "booker": RunnablePassthrough.assign(
+        output=lambda x: booking_handler(x["request"]["request"])
+    ),
+    "info": RunnablePassthrough.assign(
+        output=lambda x: info_handler(x["request"]["request"])
+    ),
+    "unclear": RunnablePassthrough.assign(
+        output=lambda x: unclear_handler(x["request"]["request"])
+    ),
+}
+
+
+def select_branch(x: dict[str, Any]) -> Runnable:
+    """Pick the handler branch for the router's decision, defaulting to 'unclear'.
+
+    A RunnableLambda that returns a Runnable invokes it with the same input, so
+    this routes the original input (`request`) to the corresponding handler.
+    """
+    return branches.get(x["decision"].strip(), branches["unclear"])
+
+
+delegation_branch = RunnableLambda(select_branch)
 
 
 # Combine the router chain and the delegation branch into a single runnable.
@@ -140,8 +260,10 @@ coordinator_agent = (
 
 def main() -> None:
     if not llm:
-        logger.warning("Skipping agent execution due to LLM initialization failure.")
-        return
+        logger.warning(
+            "LLM initialization failed; requests the local router can't place "
+            "will be treated as unclear."
+        )
 
     logger.info("--- Running with a booking request")
     request_a = "Book me a flight to London"
@@ -2,13 +2,14 @@ import argparse
 import asyncio
 import logging
 import os
-import uuid
+import secrets
 
 from common import create_parser, setup_logging
 from dotenv import load_dotenv
 from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
 from google.adk.runners import InMemoryRunner
 from google.adk.events import Event
+from google.adk.models import Gemini
 from google.adk.tools import google_search
 from google.genai import types
 
@@ -20,12 +21,17 @@ RENEWABLE_ENERGY_KEY = "renewable_energy_result"
 EV_TECHNOLOGY_KEY = "ev_technology_result"
 CARBON_CAPTURE_KEY = "carbon_capture_result"
 
+# A single model instance shared by every agent. Agents given a model name build a
+# new Gemini client for each model call; sharing one keeps its connections warm
+# across the parallel researchers and the synthesis step.
+gemini_model = Gemini(model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"))
+
 # ---- Define Researcher Sub-Agents for Parallel Execution ----
 
 
 renewable_energy_agent = LlmAgent(
     name="RenewableEnergyResearcher",
-    model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"),
+    model=gemini_model,
     instruction="""You are an AI Research Assistant specializing in energy.
     Research the latest advancementts in 'renewable energy sources'.
     Use the Google Search tool provided. Summarize your key findings concisely
@@ -37,7 +43,7 @@ renewable_energy_agent = LlmAgent(
 
 electric_vehicle_agent = LlmAgent(
     name="EVResearcher",
-    model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"),
+    model=gemini_model,
     instruction="""You are an AI Research Assistant specializing in transportation.
     Research the latest developments in 'electric vehicle technology'.
     Use the Google Search tool provided. Summarize your key findings concisely
@@ -49,7 +55,7 @@ electric_vehicle_agent = LlmAgent(
 
 carbon_capture_agent = LlmAgent(
     name="CarbonCaptureResearcher",
-    model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"),
+    model=gemini_model,
     instruction="""You are an AI Research Assistant specializing in climate solutions.
    Research the latest advancements in 'carbon capture methods'.
    Use the Google Search tool provided. Summarize your key findings concisely
@@ -71,9 +77,12 @@ parallel_research_agent = ParallelAgent(
 
 # ---- Create the Synthesis Agent ----
 
+# The research summaries are the only part of the instruction that changes between
+# runs, so they come last. Gemini's implicit caching can then reuse the static
+# instructions as a shared prompt prefix.
 synthesis_agent = LlmAgent(
     name="SynthesisAgent",
-    model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"),
+    model=gemini_model,
     instruction=f"""You are an AI Research Assistant responsible for combining research
     findings into a structured report.
 
@@ -84,15 +93,6 @@ synthesis_agent = LlmAgent(
     in the 'Input Summaries' below. Do NOT add any external knowledge, facts, or details
     not present in these specific summaries.**
 
-    **Input Summaries:**
-
-    * **Renewal Energy:**
-      {{{RENEWABLE_ENERGY_KEY}}}
-    * **Electric Vehicles:**
-      {{{EV_TECHNOLOGY_KEY}}}
-    * **Carbon Capture:**
-      {{{CARBON_CAPTURE_KEY}}}
-
     **Output Format:**
 
     ## Summary of Recent Sustainable Technology advancements
@@ -101,19 +101,19 @@ synthesis_agent = LlmAgent(
 
     (Based on RenewableEnergyResearcher's findings)
 
-    [Synthesize and elaborate *only* on the Renewable Energy input summary provided above.]
+    [Synthesize and elaborate *only* on the Renewable Energy input summary provided below.]
 
     ### Electric Vehicle Findings
 
     (Based on ElectricVehicleResearcher's findings)
 
-    [Synthesize and elaborate *only* on the EV input summary provided above.]
+    [Synthesize and elaborate *only* on the EV input summary provided below.]
 
     ### Carbon Capture Findings
 
     (Based on CarbonCaptureResearcher's findings)
 
-    [Synthesize and elaborate *only* on the Carbon Capture input summary provided above.]
+    [Synthesize and elaborate *only* on the Carbon Capture input summary provided below.]
 
     ### Overall Conclustion
 
@@ -123,6 +123,15 @@ synthesis_agent = LlmAgent(
     Output *only* the structured report following this format. Do no include any introductory
     or concluding phrases outside this structure, and strictly adhere to using only the
     provided input summary content.
+
+    **Input Summaries:**
+
+    * **Renewal Energy:**
+      {{{RENEWABLE_ENERGY_KEY}}}
+    * **Electric Vehicles:**
+      {{{EV_TECHNOLOGY_KEY}}}
+    * **Carbon Capture:**
+      {{{CARBON_CAPTURE_KEY}}}
     """,
     description="Combines research findings from parallel agents into a structured, cited report, strictly grounded on provided inputs.",
 )
@@ -149,25 +158,32 @@ def extract_content_text(event: Event) -> str | None:
         return event.content.text
 
     # Fall back to parts extraction (multimodal format)
-    if event.content.parts:
-        text_parts = [part.text for part in event.content.parts if part.text]
-        return "".join(text_parts)
+    parts = event.content.parts
+    if not parts:
+        return None
+
+    # Most events carry a single part, so skip building a list to join
+    if len(parts) == 1:
+        return parts[0].text or None
 
-    return None
+    text_parts = [part.text for part in parts if part.text]
+    return "".join(text_parts)
 
 
 async def run_pipeline(runner: InMemoryRunner) -> str | None:
     """Execute the research pipeline and return the final result."""
     # Create session
     user_id = "user_123"
-    session_id = str(uuid.uuid4())
+    session_id = secrets.token_hex(8)
     _ = await runner.session_service.create_session(
         app_name=runner.app_name, user_id=user_id, session_id=session_id
     )
 
-    # Process events from the pipeline
+    # Process events from the pipeline. ParallelAgent already runs the researchers
+    # as concurrent tasks; consuming events with `run_async` keeps them on this
+    # event loop instead of a blocking iterator.
     final_result = None
-    for event in runner.run(
+    async for event in runner.run_async(
         user_id=user_id,
         session_id=session_id,
         new_message=types.Content(
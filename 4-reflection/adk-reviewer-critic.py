@@ -7,6 +7,8 @@ from dotenv import load_dotenv
 from google.adk.agents import SequentialAgent, LlmAgent
 from google.adk.runners import InMemoryRunner
 from google.genai import types
+from pydantic import BaseModel, Field
+from typing import Literal
 import uuid
 import asyncio
 
@@ -22,7 +24,22 @@ generator = LlmAgent(
     output_key="draft_text",  # the output is saved to this state key.
 )
 
+
+class ReviewOutput(BaseModel):
+    """The fact checker's structured verdict on the draft."""
+
+    status: Literal["ACCURATE", "INACCURATE"]
+    reasoning: str = Field(
+        description=(
+            "A clear explanation for the status, citing specific issues if any "
+            "are found."
+        )
+    )
+
+
 # The second agent critiques the draft from the first agent.
+# With an output_schema, ADK asks Gemini for JSON matching ReviewOutput and
+# validates it, so the review arrives in state as a dict instead of free text.
 reviewer = LlmAgent(
     name="fact_checker",
     model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"),
@@ -36,6 +53,10 @@ reviewer = LlmAgent(
         - "reasoning": A string providing a clear explanation for your status,
            citing specific issues if any are found.
     """,
+    output_schema=ReviewOutput,
+    # An agent with an output_schema can only reply, not hand off to other agents
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
     output_key="review_output",  # The structured dictionary is saved here.
 )
 
@@ -60,11 +81,15 @@ def extract_content_text(event) -> str | None:
         return event.content.text
 
     # Fall back to parts extraction (multimodal format)
-    if event.content.parts:
-        text_parts = [part.text for part in event.content.parts if part.text]
-        return "".join(text_parts)
+    parts = event.content.parts
+    if not parts:
+        return None
 
-    return None
+    # Most events carry a single part, so skip the join
+    if len(parts) == 1:
+        return parts[0].text or None
+
+    return "".join(part.text for part in parts if part.text) or None
 
 
 async def run_pipeline(topic: str):
@@ -79,13 +104,24 @@ async def run_pipeline(topic: str):
             app_name=runner.app_name, user_id=user_id, session_id=session_id
         )
 
-        # Process events from the pipeline
-        for event in runner.run(
+        # Process events from the pipeline. `run_async` yields each event as it
+        # happens without blocking the event loop, so the draft is logged as soon
+        # as the generator finishes, while the reviewer is still working.
+        async for event in runner.run_async(
             user_id=user_id,
             session_id=session_id,
             new_message=types.Content(role="user", parts=[types.Part(text=topic)]),
         ):
             if event.is_final_response():
+                # The review is already validated and in the state update, so
+                # there is no need to join and parse the event's text
+                review = event.actions.state_delta.get(reviewer.output_key)
+                if review:
+                    print(
+                        f"\n=== REVIEW: {review['status']} ===\n{review['reasoning']}"
+                    )
+                    continue
+
                 content = extract_content_text(event)
                 if content:
                     print(f"\n=== FINAL RESULT ===\n{content}")
@@ -93,7 +129,7 @@ async def run_pipeline(topic: str):
                 # Log intermediate results
                 content = extract_content_text(event)
                 if content:
-                    logger.info(f"\n=== INTERMEDIATE RESULT ===\n{content}")
+                    logger.info("\n=== INTERMEDIATE RESULT ===\n%s", content)
     finally:
         # Clean up the runner to close HTTP connections
         if hasattr(runner, "close"):
@@ -123,5 +159,5 @@ if __name__ == "__main__":
         )
 
     # Run the pipeline using InMemoryRunner
-    logger.info(f"=== STARTING PIPELINE EXECUTION with topic: '{args.topic}' ===")
+    logger.info("=== STARTING PIPELINE EXECUTION with topic: '%s' ===", args.topic)
     asyncio.run(run_pipeline(args.topic))
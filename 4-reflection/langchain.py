@@ -1,15 +1,131 @@
 import argparse
+import contextlib
 import logging
 import os
+import sys
+from collections.abc import Iterator
+from typing import Any
 
-from common import create_parser, setup_logging
+from common import create_parser, notice, setup_logging
 from dotenv import load_dotenv
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_community.cache import SQLiteCache
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
 logger: logging.Logger = logging.getLogger(__name__)  # type: ignore[attr-defined]
 load_dotenv()
 
+# The model runs at temperature=0 and every step of the loop sends a full message
+# list. When an identical list has been sent before, e.g. on a re-run with the same
+# task, the response is answered from a local on-disk cache instead of another
+# round-trip to the model.
+set_llm_cache(SQLiteCache(database_path=".langchain.db"))
+
+PERFECT_PHRASE = "CODE_IS_PERFECT"
+
+# How many characters at the start of a review are checked for PERFECT_PHRASE
+APPROVAL_WINDOW = 32
+
+REFLECTOR_INSTRUCTIONS = f"""
+You are a senior software engineer and an expert in Python.
+Your role is to perform a meticulous code review.
+Critically evaluate the provide Python code based on the original
+task requirements.
+Look for bugs, style issues, missing edge cases, and areas for improvement.
+If the code is perfect and meets all requirements,
+respond with the single phrase '{PERFECT_PHRASE}'.
+Otherwise, provide a bulleted list of your critiques.
+"""
+
+
+def cached_text(text: str) -> dict[str, Any]:
+    """A text content block that Anthropic can serve from its prompt cache.
+
+    Everything in the prompt up to and including this block is cached, so it
+    should only follow content that doesn't change between calls.
+    """
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+class EchoTokens(BaseCallbackHandler):
+    """Writes each token to stderr as soon as the model streams it."""
+
+    def __init__(self) -> None:
+        self.streamed = False
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.streamed = True
+        sys.stderr.write(token)
+        sys.stderr.flush()
+
+
+class ReviewApproved(Exception):
+    """Raised to cut the reviewer's response short once it has approved the code."""
+
+
+class StopOnApproval(BaseCallbackHandler):
+    """Stops the stream as soon as the response opens with `PERFECT_PHRASE`.
+
+    The reviewer is told to answer with only that phrase when it is satisfied,
+    so there is no need to wait for (and pay for) the rest of the response.
+    """
+
+    raise_error = True  # let ReviewApproved propagate out of the model call
+
+    def __init__(self) -> None:
+        self.prefix = ""
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if len(self.prefix) > APPROVAL_WINDOW:
+            return
+        self.prefix += token
+        if PERFECT_PHRASE in self.prefix:
+            raise ReviewApproved
+
+
+@contextlib.contextmanager
+def quiet_approval_warnings() -> Iterator[None]:
+    """Hide LangChain's warning about StopOnApproval while the block runs.
+
+    LangChain logs a warning for any exception raised by a callback before
+    re-raising it. Stopping on approval is expected, so that warning is noise.
+    """
+    callback_logger = logging.getLogger("langchain_core.callbacks.manager")
+
+    def not_approval(record: logging.LogRecord) -> bool:
+        return StopOnApproval.__name__ not in (record.args or ())
+
+    callback_logger.addFilter(not_approval)
+    try:
+        yield
+    finally:
+        callback_logger.removeFilter(not_approval)
+
+
+def invoke_streaming(
+    messages: list[BaseMessage], callbacks: list[BaseCallbackHandler] | None = None
+) -> AIMessage:
+    """Invoke the model, echoing the response to stderr as it streams in.
+
+    Responses answered from the LLM cache are not streamed, so they are echoed
+    in one piece.
+    """
+    echo = EchoTokens()
+    # The echo goes first so it shows every token, including one that stops the stream
+    handlers = [echo, *(callbacks or [])]
+
+    try:
+        response = llm.invoke(messages, config={"callbacks": handlers})
+    finally:
+        if echo.streamed:
+            sys.stderr.write("\n")
+
+    if not echo.streamed:
+        sys.stderr.write(f"{response.text()}\n")
+    return response
+
 
 def run_reflection_loop():
     """
@@ -34,12 +150,18 @@ def run_reflection_loop():
 
     # We will build a conversation history to provide context in each step.
     # Use a List of HumanMessages.
-    message_history = [HumanMessage(content=task_prompt)]
+    # The task is replayed at the start of every generate/refine call, so it is
+    # marked as a cacheable prefix.
+    message_history = [HumanMessage(content=[cached_text(task_prompt)])]
+
+    # The reviewer's instructions and the task never change, so they go first
+    # and are cached; only the code to review varies between iterations.
+    reflector_system_message = SystemMessage(
+        content=[cached_text(REFLECTOR_INSTRUCTIONS)]
+    )
 
     for i in range(max_iterations):
-        logger.info(
-            "\n" + "=" * 25 + f" REFLECTION LOOP: ITERATION {i + 1} " + "=" * 25
-        )
+        logger.info("\n%s REFLECTION LOOP: ITERATION %d %s", "=" * 25, i + 1, "=" * 25)
 
         # --- 1. Generate / Refine stage
         # In the first iteration, it generates. In subsequent iterations, it refines.
@@ -48,7 +170,8 @@ def run_reflection_loop():
             # The first message iso just the task prompt
             # Invoke accepts a sequence of message,string pairs
             # https://python.langchain.com/api_reference/core/language_models/langchain_core.language_models.llms.LLM.html#langchain_core.language_models.llms.LLM.invoke
-            response = llm.invoke(message_history)
+            notice(logger, "--- Generated Code v%d: ---", i + 1)
+            response = invoke_streaming(message_history)
             current_code = response.content
         else:
             logger.info(">>> STAGE 2: REFINING code based on previous critique...")
@@ -59,9 +182,9 @@ def run_reflection_loop():
                     content="Please refine the code using the critiques provided."
                 )
             )
-            response = llm.invoke(message_history)
+            notice(logger, "--- Generated Code v%d: ---", i + 1)
+            response = invoke_streaming(message_history)
             current_code = response.content
-            logger.info(f"--- Generated Code v{i + 1}: ---\n{current_code}")
 
             message_history.append(response)
 
@@ -70,34 +193,29 @@ def run_reflection_loop():
 
         # Create a specific prompt for the reflector agent where it acts as a senior code reviewer.
         reflector_prompt = [
-            SystemMessage(
-                content="""
-                You are a senior software engineer and an expert in Python.
-                Your role is to perform a meticulous code review.
-                Critically evaluate the provide Python code based on the original
-                task requirements.
-                Look for bugs, style issues, missing edge cases, and areas for improvement.
-                If the code is perfect and meets all requirements,
-                respond with the single phrase 'CODE_IS_PERFECT'.
-                Otherwise, provide a bulleted list of your critiques.
-                """
-            ),
+            reflector_system_message,
             HumanMessage(
-                content=f"Original Task:\n{task_prompt}\n\nCode to Review:\n{current_code}"
+                content=[
+                    cached_text(f"Original Task:\n{task_prompt}"),
+                    {"type": "text", "text": f"Code to Review:\n{current_code}"},
+                ]
             ),
         ]
 
-        critique_response = llm.invoke(reflector_prompt)
-        critique = critique_response.content
+        notice(logger, "--- Critique ---")
+        try:
+            with quiet_approval_warnings():
+                critique = invoke_streaming(
+                    reflector_prompt, [StopOnApproval()]
+                ).content
+        except ReviewApproved:
+            critique = PERFECT_PHRASE
 
         # --- 3. STOPPING CONDITION
-        if "CODE_IS_PERFECT" in critique:
-            logger.info(
-                "--- Critique ---\nNo further critiques found. The code is satisfactory."
-            )
+        if PERFECT_PHRASE in critique:
+            logger.info("No further critiques found. The code is satisfactory.")
             break
 
-        logger.info(f"--- Critique ---\n{critique}")
         message_history.append(
             HumanMessage(content=f"Critique of the previous code: \n{critique}")
         )
@@ -121,9 +239,11 @@ if __name__ == "__main__":
             "ANTHROPIC_API_KEY environment variable not set. Add it to .env file."
         )
 
-    # Use a lower temperature for more deterministic outputs.
+    # temperature=0 makes responses repeatable, which the LLM cache relies on.
+    # Streaming lets the code and critiques be shown while they are generated.
     llm = ChatAnthropic(
         model=os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022"),
-        temperature=0.1,
+        temperature=0,
+        streaming=True,
     )
     run_reflection_loop()
@@ -3,32 +3,36 @@ import asyncio
 import getpass
 import logging
 import os
+import secrets
 from typing import List
 
-import nest_asyncio
 from dotenv import load_dotenv
 from google.adk.agents import Agent as ADKAgent
 from google.adk.agents import LlmAgent
 from google.adk.code_executors import BuiltInCodeExecutor
+from google.adk.models import Gemini
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.tools import google_search
 from google.genai import types
 
-from common import add_verbose_argument, setup_logging
+from common import add_verbose_argument, buffered, setup_logging
 
 logger: logging.Logger = logging.getLogger(name=__name__)
 _ = load_dotenv()
 
 APP_NAME = "calculator"
 USER_ID = "user1234"
-SESSION_ID = "session_code_exec_async"
 
 
+# A single model instance for every query. Given only a model name, the agent
+# builds a new Gemini client (and connection) for each model call.
+gemini_model = Gemini(model=str(os.environ.get("GOOGLE_MODEL")))
+
 # Define the Agent
 code_agent = LlmAgent(
     name="calculator_agent",
-    model=str(os.environ.get("GOOGLE_MODEL")),
+    model=gemini_model,
     code_executor=BuiltInCodeExecutor(),
     instruction="""You are a calculator agent.
 
@@ -41,21 +45,23 @@ code_agent = LlmAgent(
     description="Executes Python code to perform calculations."
 )
 
-logger.info(f"Model: {code_agent.model}")
+logger.info("Model: %s", gemini_model.model)
+
+# Session service and Runner, reused by every query. Each query gets its own session.
+session_service = InMemorySessionService()
+runner = Runner(
+    agent=code_agent,
+    app_name=APP_NAME,
+    session_service=session_service
+)
 
 # Agent interaction (async)
 async def call_agent_async(query: str) -> None:
-    # Session and Runner
-    session_service = InMemorySessionService()
-    session = await session_service.create_session(
+    session_id = secrets.token_hex(8)
+    await session_service.create_session(
         app_name=APP_NAME,
         user_id=USER_ID,
-        session_id=SESSION_ID
-    )
-    runner = Runner(
-        agent=code_agent,
-        app_name=APP_NAME,
-        session_service=session_service
+        session_id=session_id
     )
 
     content = types.Content(
@@ -74,20 +80,25 @@ async def call_agent_async(query: str) -> None:
         # This is a pattern I don't see too often in Go: having the iterator
         # be a call to a function. Makes sense if the function is yielding
         # the iterator. Something I've seen more in C# as well.
-        async for event in runner.run_async(
+        #
+        # `buffered` reads events ahead so the agent keeps running while each
+        # event is printed.
+        async for event in buffered(runner.run_async(
             user_id=USER_ID,
-            session_id=SESSION_ID,
+            session_id=session_id,
             new_message=content
-        ):
-            print(f"Event ID: {event.id}, Author: {event.author}")
+        )):
+            logger.debug("Event ID: %s, Author: %s", event.id, event.author)
 
             # Check for specific parts first.
             has_specific_part = False
 
             # Notice that this loop only does something if the LLM is
             # returning the final result. We don't bother with interim steps.
-            if event.content and event.content.parts and event.is_final_response:
-                for part in event.content.parts:
+            is_final = event.is_final_response()
+            parts = event.content.parts if event.content else None
+            if parts and is_final:
+                for part in parts:
                     # Logic specific to types of content in the current `part`
                     if part.executable_code:
                         # Access the actual code via `.code`
@@ -98,13 +109,12 @@ async def call_agent_async(query: str) -> None:
                         print(f"Debug Code Execution Result: {part.code_execution_result.outcome} - Output:\n{part.code_execution_result.output}")
                         has_specific_part = True
 
-                    elif part.text and not part.text.isspace:
+                    elif part.text and not part.text.isspace():
                         # Also print any text parts in any event for debugging
                         print(f"Text: '{part.text.strip()}'")
 
                 # Logic for all of the parts, regardless of part type
-                text_parts = [part.text for part in event.content.parts if part.text]
-                final_result = "".join(text_parts)
+                final_result = "".join(part.text for part in parts if part.text)
                 print(f"==> Final Agent Response: {final_result}")
 
     except Exception as e:
@@ -125,9 +135,11 @@ if __name__ == "__main__":
     args = parser.parse_args()
     setup_logging(args.verbose)
 
+    # A script owns its event loop, so there is no need to patch asyncio with
+    # nest_asyncio to make it reentrant.
     try:
-        nest_asyncio.apply()
-        asyncio.run(main())
+        with asyncio.Runner() as loop_runner:
+            loop_runner.run(main())
     except Exception as e:
         print(f"ERROR during agent run: {e}")
         # Handle specific error when running asyncio.run in an already running
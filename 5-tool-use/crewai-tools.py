@@ -1,4 +1,6 @@
 import argparse
+import asyncio
+import functools
 import logging
 import os
 import sys
@@ -13,33 +15,46 @@ logger: logging.Logger = logging.getLogger(name=__name__)
 _ = load_dotenv()
 STOCK_PRICE_TOOL : str = "Stock Price Lookup Tool"
 
-@tool(STOCK_PRICE_TOOL)
-def get_stock_price(ticker: str) -> float:
-    """
-    Get the current stock price for a given ticker symbol.
-    Raises a ValueError if the ticker is not found.
-    """
-    logger.info(f"Tool Call: get_stock_price({ticker})")
-    simulated_prices = {
-        "AAPL": 178.15,
-        "GOOGL": 1750.30,
-        "MSFT": 425.50,
-    }
+# Read once at import; main() reports either one missing
+ANTHROPIC_MODEL: str | None = os.environ.get("ANTHROPIC_MODEL")
+ANTHROPIC_API_KEY: str | None = os.environ.get("ANTHROPIC_API_KEY")
 
-    price = simulated_prices.get(ticker)
+# Cap the number of crews in flight to stay under the provider's rate limits
+MAX_CONCURRENT_ANALYSES = 8
+analysis_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+SIMULATED_PRICES: dict[str, float] = {
+    "AAPL": 178.15,
+    "GOOGL": 1750.30,
+    "MSFT": 425.50,
+}
+
+@functools.lru_cache(maxsize=1024)
+def lookup_price(ticker: str) -> float:
+    """Look up a normalized ticker, remembering the answer for repeat tool calls."""
+    price = SIMULATED_PRICES.get(ticker)
     if price is None:
         # Raising a specific error is better than returning a string
         # because agents are equipped to handle exceptions to decide
         # on the next action.
-        raise ValueError(f"Simulated price for ticker '{ticker.upper()}' not found")
+        raise ValueError(f"Simulated price for ticker '{ticker}' not found")
     return price
 
+@tool(STOCK_PRICE_TOOL)
+def get_stock_price(ticker: str) -> float:
+    """
+    Get the current stock price for a given ticker symbol.
+    Raises a ValueError if the ticker is not found.
+    """
+    logger.info("Tool Call: get_stock_price(%s)", ticker)
+    return lookup_price(ticker.strip().upper())
+
 # --- 2. Define the Agent ---
 
 # Create the LLM configuration first
 llm = LLM(
-    model=f"anthropic/{os.environ.get('ANTHROPIC_MODEL')}",
-    api_key=os.environ.get('ANTHROPIC_API_KEY')
+    model=f"anthropic/{ANTHROPIC_MODEL}",
+    api_key=ANTHROPIC_API_KEY
 )
 
 # The agent definition remains the same, but it will now leverage the improved tool.
@@ -54,9 +69,28 @@ financial_analyst_agent = Agent(
     allow_delegation=False
 )
 
+def known_price_answer(ticker: str) -> str | None:
+    """Answer directly when the ticker's price is already known, or return None."""
+    ticker = ticker.strip().upper()
+    price = SIMULATED_PRICES.get(ticker)
+    if price is None:
+        return None
+    return f"The simulated stock price for {ticker} is ${price:.2f}."
+
 # --- 3. Dynamic Task Creation Function ---
-def run_stock_analysis(ticker: str):
-    """Create and run a crew to analyze a specific stock ticker"""
+async def run_stock_analysis(ticker: str, always_crew: bool = False):
+    """Create and run a crew to analyze a specific stock ticker
+
+    Tickers with a known price are answered directly, skipping the crew's LLM
+    calls, unless `always_crew` is set.
+    """
+    if not always_crew and (answer := known_price_answer(ticker)):
+        logger.info("Answering %s without running a crew", ticker)
+        return answer
+
+    # Crews run concurrently in worker threads, so each one gets its own copy
+    # of the agent rather than sharing its executor state.
+    agent = financial_analyst_agent.copy()
     task = Task(
         description=(
             f"What is the current simulated stock price for {ticker.upper()} (ticker: {ticker.upper()})?"
@@ -68,33 +102,40 @@ def run_stock_analysis(ticker: str):
             f"For example: 'The simulated stock price for {ticker.upper()} is $178.15.'"
             "If the price cannot be found, state that clearly."
         ),
-        agent=financial_analyst_agent,
+        agent=agent,
     )
 
     crew = Crew(
-        agents=[financial_analyst_agent],
+        agents=[agent],
         tasks=[task],
         manager_llm=llm,
         verbose=True # Set to False for less detailed production logs.
     )
 
-    return crew.kickoff()
+    async with analysis_semaphore:
+        return await crew.kickoff_async()
 
 # -- 5. Run the Crew within a Main execution block ---
-def main():
+DEFAULT_TICKERS: list[str] = ["AAPL", "GOOGL", "MSFT", "AMZN"]
+
+async def main(tickers: list[str] = DEFAULT_TICKERS, always_crew: bool = False):
     """Main function to run stock analysis for multiple tickers"""
-    if not os.environ.get("ANTHROPIC_API_KEY") or not os.environ.get("ANTHROPIC_MODEL"):
+    if not ANTHROPIC_API_KEY or not ANTHROPIC_MODEL:
         logger.warning("ANTHROPIC_API_KEY or ANTHROPIC_MODEL environment variable is not set. Try adding a .env file.")
         print("ERROR: ANTHROPIC_API_KEY or ANTHROPIC_MODEL environment variable is not set.", file=sys.stderr)
         return
 
-    # Analyze multiple stock tickers
-    tickers = ["AAPL", "GOOGL", "MSFT", "AMZN"]
+    # The analyses are independent, so submit them all before waiting on any
+    tasks = {
+        asyncio.create_task(run_stock_analysis(ticker, always_crew)): ticker
+        for ticker in tickers
+    }
 
-    for ticker in tickers:
-        print(f"\n## Analyzing {ticker}")
-        print("-"*30)
-        result = run_stock_analysis(ticker)
+    # Report each analysis as soon as it finishes
+    async for task in asyncio.as_completed(tasks):
+        ticker = tasks[task]
+        result = task.result()
+        print(f"\n## Analysis for {ticker}")
         print("-"*30)
         print(f"Result for {ticker}: {result}")
         print()
@@ -102,8 +143,20 @@ def main():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Tool use example using CrewAI")
     add_verbose_argument(parser)
+    parser.add_argument(
+        "--tickers",
+        nargs="+",
+        default=DEFAULT_TICKERS,
+        metavar="TICKER",
+        help="Ticker symbols to analyze (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--always-crew",
+        action="store_true",
+        help="Run the crew even for tickers whose price is already known",
+    )
 
     args = parser.parse_args()
     setup_logging(args.verbose)
 
-    main()
+    asyncio.run(main(args.tickers, args.always_crew))
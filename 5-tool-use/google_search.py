@@ -4,15 +4,17 @@ import argparse
 import asyncio
 import logging
 import os
+import secrets
 
 from dotenv import load_dotenv
 from google.adk.agents import Agent
+from google.adk.models import Gemini
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.tools import google_search
 from google.genai import types
 
-from common import add_verbose_argument, setup_logging
+from common import add_verbose_argument, buffered, setup_logging
 
 logger : logging.Logger = logging.getLogger(__name__)
 _ = load_dotenv()
@@ -21,22 +23,28 @@ _ = load_dotenv()
 # All of the Google ADK tools operate in the context of a session.
 APP_NAME = "Google_Search_agent"
 USER_ID = "user1234"
-SESSION_ID = "1234"
+
+# A single model instance, so every call reuses the same Gemini client and its
+# connections instead of building a new one per model call
+gemini_model = Gemini(model=str(os.environ.get("GOOGLE_MODEL")))
 
 #Define Agent with access to search tool
 root_agent = Agent(
     name="basic_search_agent",
-    model=str(os.environ.get("GOOGLE_MODEL")),
+    model=gemini_model,
     description="Agent to answer questions using Google Search",
     instruction="I can answer you questions by searching the internet. Just ask me anything!",
     tools=[google_search] # Pre-build tool to perform Google searches
 )
 
+# The session service and runner are reused by every call; each call gets its own session
+session_service = InMemorySessionService()
+runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=session_service)
+
 # Agent interaction
 async def call_agent(query: str):
-    session_service = InMemorySessionService()
-    _ = await session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
-    runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=session_service)
+    session_id = secrets.token_hex(8)
+    _ = await session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
     content = types.Content(role='user',parts=[types.Part(text=query)])
 
 
@@ -49,9 +57,10 @@ async def call_agent(query: str):
     #                        task: <Task pending name='Task-6' coro=<AsyncClient.aclose() running at
     #                        /Users/bitsbyme/projects/agent-learn/5-tool-use/.venv/lib/python3.13/site-packages/httpx/_
     #                        client.py:1978>>
-    events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
+    events = runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content)
 
-    async for event in events:
+    # Read events ahead so the agent keeps running while each one is handled
+    async for event in buffered(events):
         if event.is_final_response():
             # Check if content or parts are None/empty to avoid AttributeError
             if not event.content or not event.content.parts:
@@ -0,0 +1,48 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from common import buffered
+
+
+async def count(n: int, produced: list[int]) -> AsyncIterator[int]:
+    for i in range(n):
+        produced.append(i)
+        yield i
+
+
+async def collect(source: AsyncIterator[int], size: int = 4) -> list[int]:
+    return [item async for item in buffered(source, size)]
+
+
+def test_yields_every_item_in_order() -> None:
+    assert asyncio.run(collect(count(10, []), size=2)) == list(range(10))
+
+
+def test_reraises_source_error_after_earlier_items() -> None:
+    async def failing() -> AsyncIterator[int]:
+        yield 1
+        yield 2
+        raise ValueError("boom")
+
+    async def consume() -> list[int]:
+        seen: list[int] = []
+        with pytest.raises(ValueError, match="boom"):
+            async for item in buffered(failing()):
+                seen.append(item)
+        return seen
+
+    assert asyncio.run(consume()) == [1, 2]
+
+
+def test_stops_reading_ahead_when_consumer_stops() -> None:
+    produced: list[int] = []
+
+    async def first_item() -> None:
+        async for _ in buffered(count(1000, produced), size=4):
+            break
+
+    asyncio.run(first_item())
+    # One item taken, up to `size` queued, and one blocked on the full queue
+    assert len(produced) <= 6
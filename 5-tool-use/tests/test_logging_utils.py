@@ -0,0 +1,67 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from common import NOTICE, JSONFormatter, notice, parse_verbosity
+
+
+@pytest.mark.parametrize(
+    ("argv", "expected"),
+    [
+        ([], 0),
+        (["-v"], 1),
+        (["-vv"], 2),
+        (["-v", "--verbose"], 2),
+        (["query", "-vvv"], 3),
+        (["--", "-v"], 0),
+        (["-x", "-vx", "-"], 0),
+    ],
+)
+def test_parse_verbosity(argv: list[str], expected: int) -> None:
+    assert parse_verbosity(argv) == expected
+
+
+def test_json_formatter_includes_extra_fields() -> None:
+    record = logging.makeLogRecord(
+        {
+            "name": "agent",
+            "levelno": NOTICE,
+            "levelname": "NOTICE",
+            "msg": "Tool called: %s",
+            "args": ("search",),
+            "tool": "search",
+        }
+    )
+
+    entry = json.loads(JSONFormatter().format(record))
+
+    assert entry["level"] == "NOTICE"
+    assert entry["logger"] == "agent"
+    assert entry["msg"] == "Tool called: search"
+    assert entry["tool"] == "search"
+    assert "args" not in entry
+
+
+def test_json_formatter_includes_exception() -> None:
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "agent", logging.ERROR, __file__, 1, "failed", None, sys.exc_info()
+        )
+
+    entry = json.loads(JSONFormatter().format(record))
+
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_notice_is_attributed_to_its_caller(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(NOTICE):
+        notice(logging.getLogger("agent"), "hello %s", "world")
+
+    [record] = caplog.records
+    assert record.levelno == NOTICE
+    assert record.getMessage() == "hello world"
+    assert record.funcName == "test_notice_is_attributed_to_its_caller"
@@ -0,0 +1,41 @@
+import numpy as np
+
+from common.semantic_cache import SemanticCache
+
+
+def unit(*values: float) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_lookup_on_empty_cache_misses() -> None:
+    cache = SemanticCache(dimension=3, threshold=0.9)
+    assert cache.lookup(unit(1, 0, 0)) is None
+
+
+def test_lookup_returns_the_most_similar_value_above_threshold() -> None:
+    cache = SemanticCache(dimension=3, threshold=0.9)
+    cache.add(unit(1, 0, 0), "x")
+    cache.add(unit(0, 1, 0), "y")
+
+    assert cache.lookup(unit(1, 0.1, 0)) == "x"
+    assert cache.lookup(unit(0.1, 1, 0)) == "y"
+
+
+def test_lookup_below_threshold_misses() -> None:
+    cache = SemanticCache(dimension=3, threshold=0.9)
+    cache.add(unit(1, 0, 0), "x")
+
+    # cos(45°) ≈ 0.71
+    assert cache.lookup(unit(1, 1, 0)) is None
+
+
+def test_entries_persist_across_instances(tmp_path) -> None:
+    path = str(tmp_path / "cache")
+    cache = SemanticCache(dimension=3, threshold=0.9, path=path)
+    cache.add(unit(1, 0, 0), {"output": "x"})
+
+    reloaded = SemanticCache(dimension=3, threshold=0.9, path=path)
+    assert reloaded.lookup(unit(1, 0, 0)) == {"output": "x"}
+    assert (tmp_path / "cache.faiss").exists()
+    assert (tmp_path / "cache.json").exists()
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any
+
+import numpy as np
+import pytest
+
+import tool_agent
+from common.semantic_cache import SemanticCache
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "capital of France",
+        "What is the capital of France?",
+        "  what's   the CAPITAL of france ",
+        "tell me the capital of france.",
+    ],
+)
+def test_known_answer_for_a_known_topic(query: str) -> None:
+    assert tool_agent.known_answer(query) == "The capital of France is Paris."
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "What was the capital of France before Paris?",
+        "capital of france and germany",
+        "Why is the weather in London so bad?",
+        "capital",
+    ],
+)
+def test_no_known_answer_for_anything_more(query: str) -> None:
+    assert tool_agent.known_answer(query) is None
+
+
+class FakeExecutor:
+    def __init__(self, output: str) -> None:
+        self.output = output
+
+    async def ainvoke(self, inputs: dict[str, str]) -> dict[str, Any]:
+        return {**inputs, "output": self.output}
+
+
+@pytest.fixture
+def semantic_cache(monkeypatch: pytest.MonkeyPatch) -> SemanticCache:
+    cache = SemanticCache(dimension=3, threshold=0.9)
+    monkeypatch.setattr(tool_agent, "get_semantic_cache", lambda: cache)
+    monkeypatch.setattr(
+        tool_agent, "embed", lambda query: np.array([1, 0, 0], dtype=np.float32)
+    )
+    return cache
+
+
+def test_answer_is_reused_for_a_similar_query(
+    semantic_cache: SemanticCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(tool_agent, "get_executor", lambda: FakeExecutor("Paris"))
+
+    async def ask_twice() -> dict[str, Any]:
+        await tool_agent.answer_query("capital of france", stream=False)
+        monkeypatch.setattr(tool_agent, "get_executor", lambda: FakeExecutor("?"))
+        return await tool_agent.answer_query("france's capital", stream=False)
+
+    response = asyncio.run(ask_twice())
+
+    assert response == {"input": "france's capital", "output": "Paris"}
+
+
+def test_empty_answer_is_not_cached(
+    semantic_cache: SemanticCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(tool_agent, "get_executor", lambda: FakeExecutor(""))
+
+    asyncio.run(tool_agent.answer_query("capital of france", stream=False))
+
+    assert semantic_cache.index.ntotal == 0
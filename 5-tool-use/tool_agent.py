@@ -1,29 +1,53 @@
 import argparse
 import asyncio
+import functools
 import logging
 import os
+import re
 import sys
+import threading
+from collections.abc import Awaitable
+from typing import TYPE_CHECKING, Any
 
-import nest_asyncio
 from dotenv import load_dotenv
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from common import add_verbose_argument, setup_logging
+from common import add_verbose_argument, notice, setup_logging
 
-load_dotenv()
-logger: logging.Logger = logging.getLogger(__name__)  # type: ignore[attr-defined]
+# LangChain's agents, the Gemini client and the embedding model (torch) take
+# seconds to import, so they are only imported when first needed. That keeps
+# `--help` and importing this module fast.
+if TYPE_CHECKING:
+    import numpy as np
+    from langchain.agents import AgentExecutor
+    from sentence_transformers import SentenceTransformer
 
+    from common.semantic_cache import SemanticCache
 
-try:
-    llm: ChatGoogleGenerativeAI = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"), temperature=0
-    )
-except Exception as e:
-    logger.error(f"🔴 Error initializing language model: {e}")
-    sys.exit(1)
+# Skip reading .env when the environment already provides the settings,
+# e.g. in a container.
+if not {"GOOGLE_API_KEY", "GOOGLE_MODEL"} <= os.environ.keys():
+    load_dotenv()
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+# Simulate a search tool with a dictionary of predefined results, keyed by casefolded query.
+SIMULATED_RESULTS: dict[str, str] = {
+    "weather in london": "The weather in London is currently cloudy with a temperature of 15°C.",
+    "capital of france": "The capital of France is Paris.",
+    "population of earth": "The estimated population of Earth is around 8 billion people.",
+    "tallest mountain": "Mount Everest is the tallest mountain above sea level.",
+}
+DEFAULT_RESULT_TEMPLATE = "Simulated search result for '{}': No specific information found, but the topic seems interesting."
+
+# Matches a normalized query that is just a topic with a simulated result, optionally
+# wrapped as a simple question ("what is the capital of france?"). Anything more,
+# like "what was the capital of france before paris?", is left to the agent.
+KNOWN_QUERY = re.compile(
+    r"(?:(?:what is|what's|tell me) (?:the )?)?"
+    rf"(?P<topic>{'|'.join(map(re.escape, SIMULATED_RESULTS))})"
+    r" ?[?.!]*"
+)
 
 
 @tool
@@ -33,19 +57,22 @@ def search_information(query: str) -> str:
     Use this tool to find answers to phrases like 'capital of France'
     or 'weather in London?'.
     """
-    logger.notice(f"--- 🔎 Tool Called: search_information with query: '{query}' ---")  # type: ignore[attr-defined]
-
-    # Simulate a search tool with a dictionary of predefined results.
-    simulated_results = {
-        "weather in london": "The weather in London is currently cloudy with a temperature of 15°C.",
-        "capital of france": "The capital of France is Paris.",
-        "population of earth": "The estimated population of Earth is around 8 billion people.",
-        "tallest mountain": "Mount Everest is the tallest mountain above sea level.",
-        "default": f"Simulated search result for '{query}': No specific information found, but the topic seems interesting.",
-    }
-
-    result = simulated_results.get(query.lower(), simulated_results["default"])
-    logger.notice(f"--- 🔎 Tool Result: '{result}' ---")  # type: ignore[attr-defined]
+    notice(
+        logger,
+        "--- 🔎 Tool Called: search_information with query: '%s' ---",
+        query,
+        extra={"event": "tool_called", "tool": "search_information", "query": query},
+    )
+
+    result = SIMULATED_RESULTS.get(query.casefold())
+    if result is None:
+        result = DEFAULT_RESULT_TEMPLATE.format(query)
+    notice(
+        logger,
+        "--- 🔎 Tool Result: '%s' ---",
+        result,
+        extra={"event": "tool_result", "tool": "search_information", "result": result},
+    )
     return result
 
 
@@ -53,76 +80,261 @@ tools = [search_information]
 
 # --- Create a Tool-Calling Agent ---
 
-agent_prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", "You are a helpful assistant."),
-        ("human", "{input}"),
-        # See README.md for more on the `agent_scratchpad`
-        ("placeholder", "{agent_scratchpad}"),
-    ]
-)
 
-# Create the agent, binding the LLM, tools, and prompt together
-# What it does**:
-# 1. Binds the LLM with the tools, enabling the model to generate tool calls
-# 2. Creates an agent that can reason about when to use tools
-# 3. Formats the prompt to include the agent's scratchpad for tracking tool usage history
-# 4. Returns a runnable agent object that can be executed by an AgentExecutor
-#
-# **Result**: An agent that can interpret user queries, decide which tools to use,
-# call those tools, and incorporate the results into its responses.
-# The agent handles the reasoning loop of: analyze query → decide on tool → call tool →
-# incorporate result → respond to user.
-agent = create_tool_calling_agent(llm, tools, agent_prompt)
-
-# AgentExecutor is the runtime that invokes the agent and executes The
-# chosen tools.
-# The 'tools' agrument is not needed here as they are already bound to the agent.
-agent_executor = AgentExecutor(agent=agent, verbose=True, tools=tools)
-
-
-async def run_agent_with_tool(query: str) -> str:
-    """Invokes the agent executor with a query and prints the final response."""
-    logger.notice(f"--- 🤖 Running Agent with Query: '{query}' ---")  # type: ignore[attr-defined]
+@functools.cache
+def get_executor() -> "AgentExecutor":
+    """Build the LLM, agent and executor on first use and return the executor.
+
+    Raises whatever the model raised if it can't be initialized, e.g. without an
+    API key. Failures aren't cached, so the next call tries again.
+    """
+    from langchain.agents import AgentExecutor, create_tool_calling_agent
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    # Async calls go through a gRPC client that the model creates on first use and
+    # keeps, so the concurrent queries share one HTTP/2 channel to Gemini. There is
+    # no httpx client to share.
     try:
-        response = await agent_executor.ainvoke({"input": query})
-        logger.notice(f"--- 🤖 Final Agent Response: '{response}' ---")  # type: ignore[attr-defined]
+        llm: ChatGoogleGenerativeAI = ChatGoogleGenerativeAI(
+            model=os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp"), temperature=0
+        )
+    except Exception as e:
+        logger.error("🔴 Error initializing language model: %s", e)
+        raise
+
+    agent_prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", "You are a helpful assistant."),
+            ("human", "{input}"),
+            # See README.md for more on the `agent_scratchpad`
+            ("placeholder", "{agent_scratchpad}"),
+        ]
+    )
+
+    # Create the agent, binding the LLM, tools, and prompt together
+    # What it does**:
+    # 1. Binds the LLM with the tools, enabling the model to generate tool calls
+    # 2. Creates an agent that can reason about when to use tools
+    # 3. Formats the prompt to include the agent's scratchpad for tracking tool usage history
+    # 4. Returns a runnable agent object that can be executed by an AgentExecutor
+    #
+    # **Result**: An agent that can interpret user queries, decide which tools to use,
+    # call those tools, and incorporate the results into its responses.
+    # The agent handles the reasoning loop of: analyze query → decide on tool → call tool →
+    # incorporate result → respond to user.
+    agent = create_tool_calling_agent(llm, tools, agent_prompt)
+
+    # AgentExecutor is the runtime that invokes the agent and executes The
+    # chosen tools.
+    # The 'tools' agrument is not needed here as they are already bound to the agent.
+    return AgentExecutor(agent=agent, verbose=True, tools=tools)
+
+
+# Cap the number of agent runs in flight to stay under the provider's rate limits
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "8"))
+agent_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+# Agent runs by normalized query, so a repeated query skips the LLM round-trips.
+# The task is stored rather than its result so that a duplicate arriving while
+# the first run is still in flight waits on that run instead of starting another.
+response_cache: dict[str, asyncio.Task[dict[str, Any]]] = {}
+
+
+# Queries that miss the exact cache are compared with earlier ones by sentence
+# embedding, so a rephrased question ("What's France's capital?") reuses the answer.
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+
+def normalize_query(query: str) -> str:
+    """Casefold and collapse whitespace so trivially different queries share a cache entry."""
+    return " ".join(query.casefold().split())
+
+
+@functools.cache
+def get_embedder() -> "SentenceTransformer":
+    """Load the sentence embedding model on first use."""
+    from sentence_transformers import SentenceTransformer
+
+    logger.info("Loading embedding model: %s", EMBEDDING_MODEL)
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+# Queries are embedded in worker threads; only one of them should load the model
+_embedder_lock = threading.Lock()
+
+
+def embed(query: str) -> "np.ndarray":
+    """Embed a query for the semantic cache. Blocking, so run it in a thread."""
+    with _embedder_lock:
+        embedder = get_embedder()
+    return embedder.encode(query, normalize_embeddings=True)
+
+
+@functools.cache
+def get_semantic_cache() -> "SemanticCache":
+    from common.semantic_cache import SemanticCache
+
+    return SemanticCache(
+        dimension=get_embedder().get_sentence_embedding_dimension(),
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+    )
+
+
+async def stream_agent(query: str) -> dict[str, Any]:
+    """Runs the agent, echoing the model's tokens to stderr as they arrive.
+
+    Returns the same response dict as `ainvoke`, taken from the executor's end event.
+    """
+    response: dict[str, Any] = {}
+    async for event in get_executor().astream_events({"input": query}, version="v2"):
+        if event["event"] == "on_chat_model_stream":
+            sys.stderr.write(event["data"]["chunk"].text())
+            sys.stderr.flush()
+        elif event["event"] == "on_chain_end" and not event["parent_ids"]:
+            response = event["data"]["output"]
+    sys.stderr.write("\n")
+    if not response:
+        raise RuntimeError("The agent run ended without a final response")
+    return response
+
+
+async def run_limited(run: Awaitable[dict[str, Any]]) -> dict[str, Any]:
+    """Awaits an agent run once fewer than MAX_CONCURRENCY runs are in flight."""
+    async with agent_semaphore:
+        return await run
+
+
+async def invoke_cached(query: str, stream: bool = False) -> dict[str, Any]:
+    """Invokes the agent executor, reusing the response for the same or a similar query.
+
+    With `stream`, a query that has to run the agent echoes the answer as it is generated.
+    """
+    key = normalize_query(query)
+    if (task := response_cache.get(key)) is not None:
+        logger.info("Reusing cached response for query: '%s'", query)
+        return await task
+
+    # Registered before the first await, so a duplicate can't slip in and start another run
+    task = asyncio.create_task(answer_query(query, stream))
+    response_cache[key] = task
+    try:
+        return await task
+    except Exception:
+        # Don't keep failures around; the next caller should try again
+        response_cache.pop(key, None)
+        raise
+
+
+async def answer_query(query: str, stream: bool) -> dict[str, Any]:
+    """Answers from the response to a similar earlier query, or by running the agent."""
+    # Loading the model and encoding are blocking, so keep them off the event loop
+    embedding = await asyncio.to_thread(embed, query)
+    semantic_cache = get_semantic_cache()
+    if (response := semantic_cache.lookup(embedding)) is not None:
+        logger.info("Reusing response to a similar query for: '%s'", query)
+        return {**response, "input": query}
+
+    run = stream_agent(query) if stream else get_executor().ainvoke({"input": query})
+    response = await run_limited(run)
+    # An empty answer would be handed to every similar query after this one
+    if response.get("output"):
+        semantic_cache.add(embedding, response)
+    return response
+
+
+def known_answer(query: str) -> str | None:
+    """Answer directly when the query only asks for a topic with a simulated result, or return None."""
+    match = KNOWN_QUERY.fullmatch(normalize_query(query))
+    return SIMULATED_RESULTS[match["topic"]] if match else None
+
+
+async def run_agent_with_tool(
+    query: str, stream: bool = False, always_agent: bool = False
+) -> str:
+    """Invokes the agent executor with a query and prints the final response.
+
+    Queries about a topic with a simulated result are answered directly, skipping
+    the agent's LLM calls, unless `always_agent` is set.
+    """
+    if not always_agent and (answer := known_answer(query)):
+        notice(logger, "--- ⚡ Answering without the agent: '%s' ---", query)
+        print(answer)
+        return answer
+
+    notice(logger, "--- 🤖 Running Agent with Query: '%s' ---", query)
+    try:
+        response = await invoke_cached(query, stream)
+        notice(logger, "--- 🤖 Final Agent Response: '%s' ---", response)
         print(response["output"])
         return str(response["output"])
     except Exception as e:
-        logger.error(f"An error occurred during agent execution: {e}")
+        logger.error("An error occurred during agent execution: %s", e)
         return ""
 
 
-async def main():
-    """Runs all agent queries concurrently."""
-    tasks = [
-        run_agent_with_tool("What is the capital of France?"),
-        run_agent_with_tool("What's the weather like in London?"),
-        run_agent_with_tool("Tell me something about dogs."),
-    ]
+async def run_agent_batch(queries: list[str], always_agent: bool = False) -> list[str]:
+    """Runs a batch of queries concurrently and returns the answers in the same order.
+
+    Queries that only differ by case or whitespace are run once and share the answer.
+    A single query streams its answer; several would interleave their tokens.
+    """
+    unique_queries: dict[str, str] = {}
+    for query in queries:
+        unique_queries.setdefault(normalize_query(query), query)
+    stream = len(unique_queries) == 1
 
     """
     `await asyncio.gather(*tasks)` runs multiple async operations concurrently and waits for all of them to complete.
 
     Breaking it down:
 
-    1. **`tasks`**: A list of coroutines (async function calls) - in this case, 3 calls to `run_agent_with_tool()` with different queries
+    1. **`tasks`**: A list of coroutines (async function calls) - one call to `run_agent_with_tool()` per distinct query
     2. **`*tasks`**: Unpacks the list, passing each coroutine as a separate argument to `gather()`
     3. **`asyncio.gather()`**: Runs all coroutines concurrently and waits for all to finish
     4. **`await`**: Waits for the entire gather operation to complete
 
-    Instead of running the 3 agent queries sequentially (which would take longer), this executes all 3 queries simultaneously,
+    Instead of running the agent queries sequentially (which would take longer), this executes all of them simultaneously,
     making the program faster by leveraging async concurrency.
     """
-    await asyncio.gather(*tasks)
+    tasks = [
+        run_agent_with_tool(query, stream, always_agent)
+        for query in unique_queries.values()
+    ]
+    answers = dict(zip(unique_queries, await asyncio.gather(*tasks)))
+    return [answers[normalize_query(query)] for query in queries]
+
+
+DEFAULT_QUERIES: list[str] = [
+    "What is the capital of France?",
+    "What's the weather like in London?",
+    "Tell me something about dogs.",
+]
+
+
+async def main(queries: list[str] = DEFAULT_QUERIES, always_agent: bool = False):
+    """Runs all agent queries concurrently."""
+    await run_agent_batch(queries, always_agent)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run reflection agents")
     add_verbose_argument(parser)
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        default=DEFAULT_QUERIES,
+        help="Queries to ask the agent. A single query streams its answer.",
+    )
+    parser.add_argument(
+        "--always-agent",
+        action="store_true",
+        help="Run the agent even for queries with a known simulated answer",
+    )
     args = parser.parse_args()
     setup_logging(args.verbose)
 
-    nest_asyncio.apply()
-    asyncio.run(main())
+    # This script owns the event loop, so it doesn't need nest_asyncio.
+    # In a notebook, which already runs a loop, use `await main()` instead.
+    asyncio.run(main(args.queries, args.always_agent))
@@ -1,8 +1,23 @@
+from .async_utils import buffered
 from .logging_utils import (
+    NOTICE,
+    JSONFormatter,
     add_verbose_argument,
     create_parser,
     init,
+    notice,
+    parse_verbosity,
     setup_logging,
 )
 
-__all__ = ["init", "setup_logging", "create_parser", "add_verbose_argument"]
+__all__ = [
+    "init",
+    "setup_logging",
+    "create_parser",
+    "add_verbose_argument",
+    "parse_verbosity",
+    "notice",
+    "NOTICE",
+    "JSONFormatter",
+    "buffered",
+]
@@ -0,0 +1,52 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Marks the end of the source iterator in the buffer queue
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception raised by the source iterator through the queue."""
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+async def buffered(source: AsyncIterable[T], size: int = 4) -> AsyncIterator[T]:
+    """Iterate over `source` while a background task reads ahead of the consumer.
+
+    Up to `size` items are fetched before they are asked for, so the producer
+    keeps working while the loop body is still handling the previous item.
+    Items are yielded in order, and an exception raised by `source` is re-raised
+    once the items before it have been consumed.
+
+    Example:
+        async for event in buffered(runner.run_async(...)):
+            ...
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=size)
+
+    async def pump() -> None:
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(_Failure(e))
+        else:
+            await queue.put(_DONE)
+
+    task = asyncio.create_task(pump())
+    try:
+        while (item := await queue.get()) is not _DONE:
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Stop reading ahead if the consumer stopped early
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
@@ -1,83 +1,171 @@
 import argparse
+import functools
+import json
 import logging
 import os
 import sys
-from typing import Optional
+from collections.abc import Sequence
+from typing import Any, Optional
 
 from rich.console import Console
 from rich.logging import RichHandler
 
+# Between INFO and WARNING: essential user-facing messages, shown without -v
+NOTICE = 25
+logging.addLevelName(NOTICE, "NOTICE")
 
-def setup_logging(verbosity_level: int = 0):
+
+def notice(logger: logging.Logger, msg: str, *args: Any, **kwargs: Any) -> None:
+    """Log `msg` at NOTICE level, which is visible by default.
+
+    Takes %-style arguments like the logger methods, e.g.
+    `notice(logger, "Running query: %s", query)`.
+    """
+    # Attribute the record to the caller rather than to this helper
+    kwargs.setdefault("stacklevel", 2)
+    logger.log(NOTICE, msg, *args, **kwargs)
+
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats each record as a single line of JSON, for shipping to a log collector.
+
+    Fields passed with `extra=` are included alongside the message, e.g.
+    `notice(logger, "Tool called", extra={"tool": "search", "query": query})`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+@functools.cache
+def _get_handler(json_format: bool = False) -> logging.Handler:
+    """The log handler, built once and shared by every setup_logging() call."""
+    if json_format:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JSONFormatter())
+        return handler
+
+    # Explicitly create Console for stderr
+    console = Console(file=sys.stderr, force_terminal=True)
+    rich_handler: logging.Handler = RichHandler(
+        console=console, rich_tracebacks=True, show_path=False, markup=True
+    )
+    formatter = logging.Formatter("%(message)s", datefmt="[%X]")
+    rich_handler.setFormatter(formatter)
+    return rich_handler
+
+
+def setup_logging(verbosity_level: int = 0) -> None:
     """Configures logging based on verbosity level.
 
+    Set LOG_FORMAT=json to write JSON lines (see JSONFormatter) instead of
+    Rich's colored output.
+
     Args:
-        verbosity_level: 0 = WARNING (quiet), 1 = INFO, 2+ = DEBUG
+        verbosity_level: 0 = NOTICE (quiet), 1 = INFO, 2+ = DEBUG
     """
     if verbosity_level >= 2:
-        log_level = logging.DEBUG
+        log_level: int = logging.DEBUG
     elif verbosity_level == 1:
         log_level = logging.INFO
     else:
-        log_level = logging.WARNING
+        log_level = NOTICE
 
+    _configure(log_level)
+
+
+def _configure(log_level: int) -> None:
+    """Set the root level and attach the shared handler."""
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
-    if root_logger.hasHandlers():
+    # Calling again only changes the level
+    handler = _get_handler(os.getenv("LOG_FORMAT", "").lower() == "json")
+    if root_logger.handlers != [handler]:
         root_logger.handlers.clear()
-
-    # Explicitly create Console for stderr
-    console = Console(file=sys.stderr, force_terminal=True)
-    handler = RichHandler(
-        console=console, rich_tracebacks=True, show_path=False, markup=True
-    )
-    formatter = logging.Formatter("%(message)s", datefmt="[%X]")
-    handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+        root_logger.addHandler(handler)
 
     # Silence noisy libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
 
 
-def init(verbosity: Optional[int] = None):
+def parse_verbosity(argv: Optional[Sequence[str]] = None) -> int:
+    """Count -v/--verbose flags in `argv` (default: sys.argv[1:]) without argparse.
+
+    `-vv` counts as two. Arguments after `--` are ignored, as are any other
+    arguments, so scripts with no other options don't need a parser at all.
+    """
+    verbosity = 0
+    for arg in sys.argv[1:] if argv is None else argv:
+        if arg == "--":
+            break
+        if arg == "--verbose":
+            verbosity += 1
+        elif len(arg) > 1 and arg[0] == "-" and arg[1:] == "v" * (len(arg) - 1):
+            verbosity += len(arg) - 1
+    return verbosity
+
+
+def init(verbosity: Optional[int] = None) -> None:
     """Initialize logging with smart defaults.
 
     Reads verbosity from (in order of priority):
     1. Explicit verbosity argument
-    2. LOG_LEVEL environment variable (DEBUG, INFO, WARNING, ERROR)
-    3. Default to WARNING (quiet)
+    2. -v/--verbose flags on the command line (see parse_verbosity)
+    3. LOG_LEVEL environment variable (DEBUG, INFO, NOTICE, WARNING, ERROR)
+    4. Default to NOTICE (quiet)
 
     This is the simplest entry point - just call once at script start.
     """
+    if verbosity is None:
+        verbosity = parse_verbosity() or None
+
     if verbosity is None:
         # Try to read from environment
-        log_level_str = os.getenv("LOG_LEVEL", "WARNING").upper()
-        level_map = {"DEBUG": 2, "INFO": 1, "WARNING": 0, "ERROR": 0}
-        verbosity = level_map.get(log_level_str, 0)
+        log_level_str = os.getenv("LOG_LEVEL", "NOTICE").upper()
+        level_map: dict[str, int] = {
+            "DEBUG": logging.DEBUG,
+            "INFO": logging.INFO,
+            "NOTICE": NOTICE,
+            "WARNING": logging.WARNING,
+            "ERROR": logging.ERROR,
+        }
+        _configure(level_map.get(log_level_str, NOTICE))
+        return
 
     setup_logging(verbosity)
 
 
-def create_parser(description: str, **kwargs) -> argparse.ArgumentParser:
+def create_parser(description: str, **kwargs: Any) -> argparse.ArgumentParser:
     """Create an ArgumentParser with verbose flag pre-configured.
 
     Returns a parser with -v/--verbose already added.
     Call parser.parse_args() then pass args.verbose to setup_logging().
     """
     parser = argparse.ArgumentParser(description=description, **kwargs)
-    parser.add_argument(
-        "-v",
-        "--verbose",
-        action="count",
-        default=0,
-        help="Increase verbosity (-v for INFO, -vv for DEBUG)",
-    )
+    add_verbose_argument(parser)
     return parser
 
 
-def add_verbose_argument(parser: argparse.ArgumentParser):
+def add_verbose_argument(parser: argparse.ArgumentParser) -> None:
     """Adds verbose argument to existing parser (legacy API)."""
     parser.add_argument(
         "-v",
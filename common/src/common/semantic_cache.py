@@ -0,0 +1,60 @@
+"""A similarity-keyed cache for embeddings.
+
+Needs the `semantic` extra: `uv add "common[semantic]"`.
+"""
+
+import json
+import logging
+import os
+from typing import Any, List, Optional
+
+import faiss
+import numpy as np
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Stores values against embeddings and returns them for similar embeddings.
+
+    Embeddings must be L2-normalized so that inner-product scores from the FAISS
+    index are cosine similarities. When `path` is set the index is saved to
+    `<path>.faiss` and the values to `<path>.json` after every insert, so values
+    must be JSON serializable.
+    """
+
+    def __init__(
+        self, dimension: int, threshold: float, path: Optional[str] = None
+    ) -> None:
+        self.threshold = threshold
+        self.path = path
+        if path and os.path.exists(f"{path}.faiss"):
+            self.index = faiss.read_index(f"{path}.faiss")
+            with open(f"{path}.json") as f:
+                self.values: List[Any] = json.load(f)
+            logger.info("Loaded %d cached entries from %s", len(self.values), path)
+        else:
+            self.index = faiss.IndexFlatIP(dimension)
+            self.values = []
+
+    def lookup(self, embedding: np.ndarray) -> Optional[Any]:
+        """Return the value of the most similar entry if it clears the threshold."""
+        if self.index.ntotal == 0:
+            return None
+        scores, ids = self.index.search(_as_row(embedding), 1)
+        if scores[0][0] < self.threshold:
+            return None
+        return self.values[ids[0][0]]
+
+    def add(self, embedding: np.ndarray, value: Any) -> None:
+        self.index.add(_as_row(embedding))
+        self.values.append(value)
+        if self.path:
+            faiss.write_index(self.index, f"{self.path}.faiss")
+            with open(f"{self.path}.json", "w") as f:
+                json.dump(self.values, f)
+
+
+def _as_row(embedding: np.ndarray) -> np.ndarray:
+    """FAISS expects a 2-D float32 array with one row per vector."""
+    return np.asarray(embedding, dtype=np.float32).reshape(1, -1)
@@ -2,12 +2,18 @@
 # Create a .env file in the same directory as the script
 import argparse
 import logging
+import os
 
 from common import add_verbose_argument, setup_logging
 from dotenv import load_dotenv
 
 logger : logging.Logger = logging.getLogger(__name__)
-_ = load_dotenv()
+
+# Only read .env when the environment doesn't already have the settings.
+# List the variables your script needs.
+REQUIRED_ENV: set[str] = {"GOOGLE_API_KEY"}
+if not REQUIRED_ENV <= os.environ.keys():
+    _ = load_dotenv()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(